@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from typing import Callable, Optional
+import h5py
+import numpy as np
+from qdrant_client import QdrantClient
+from sqlmodel import SQLModel, Session, create_engine
+from models import Annotation, Source
+from fasta import calculate_md5, read_fasta
+from bulk import batched
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+AMINO_ACIDS = np.array(list("ACDEFGHIKLMNPQRSTVWY"))
+EMBEDDING_DIM = 1024
+
+
+# Write a UniProt-style FASTA file of random sequences and return (accession, sequence) pairs
+def generate_fasta(file_path: str, count: int, min_length: int = 50, max_length: int = 1000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    proteins = []
+    with open(file_path, 'w') as fasta_file:
+        for number in range(count):
+            accession = f"SYN{number:07d}"
+            sequence = ''.join(rng.choice(AMINO_ACIDS, rng.integers(min_length, max_length + 1)))
+            fasta_file.write(f">sp|{accession}|{accession}_SYNTH Synthetic protein {number}\n")
+            for start in range(0, len(sequence), 60):
+                fasta_file.write(sequence[start:start + 60] + "\n")
+            proteins.append((accession, sequence))
+    return proteins
+
+# Write matching embedding files: one keyed by sequence hash (embeddings.h5 layout) and
+# one keyed by accession (the layout swiss_upload_protein.py reads)
+def generate_embeddings(hash_file: str, accession_file: str, proteins, seed: int = 0):
+    rng = np.random.default_rng(seed + 1)
+    with h5py.File(hash_file, 'w') as by_hash, h5py.File(accession_file, 'w') as by_accession:
+        for accession, sequence in proteins:
+            vector = rng.standard_normal(EMBEDDING_DIM).astype(np.float32)
+            hash_value = calculate_md5(sequence)
+            if hash_value not in by_hash:
+                by_hash[hash_value] = vector
+            by_accession[accession] = vector
+
+# Write a countByFeatureType annotation file in the uniprot_fetch.py JSON Lines format
+def generate_annotations(file_path: str, proteins, seed: int = 0):
+    rng = np.random.default_rng(seed + 2)
+    feature_types = ["Active site", "Binding site", "Chain", "Domain", "Signal", "Transmembrane"]
+    with open(file_path, 'w') as annotation_file:
+        for accession, _ in proteins:
+            counts = {feature: int(rng.integers(0, 4)) for feature in feature_types if rng.random() < 0.5}
+            annotation_file.write(json.dumps({"accession": accession, "countByFeatureType": counts}) + "\n")
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Run one stage and record its wall time and throughput
+def _time_stage(results: dict, name: str, items: int, stage: Callable):
+    start = time.perf_counter()
+    stage()
+    seconds = time.perf_counter() - start
+    results[name] = {"seconds": seconds, "items": items, "items_per_s": items / seconds if seconds else None}
+    logger.warning(f"{name}: {seconds:.3f}s ({items} items)")
+
+def run_benchmark(work_dir: str, proteins: int = 10000, queries: int = 100, min_length: int = 50,
+                  max_length: int = 1000, database_url: Optional[str] = None, qdrant_url: Optional[str] = None,
+                  batch_size: int = 32, limit: int = 200, seed: int = 0) -> dict:
+    # The loaders create their own engines and clients at import time and the search script
+    # on first use; the benchmark points them at the local stand-ins instead
+    import upload_protein
+    import swiss_upload_protein
+    import swiss_upload_protein_source
+    import upload_annotation_source
+    import swissprot_search_annotation
+
+    fasta_file = os.path.join(work_dir, "synthetic.fasta")
+    hash_file = os.path.join(work_dir, "embeddings.h5")
+    accession_file = os.path.join(work_dir, "embeddings_by_accession.h5")
+    annotation_file = os.path.join(work_dir, "annotations.jsonl")
+
+    generated = generate_fasta(fasta_file, proteins, min_length, max_length, seed)
+    generate_embeddings(hash_file, accession_file, generated, seed)
+    generate_annotations(annotation_file, generated, seed)
+    stages = {}
+
+    engine = create_engine(database_url or f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Source(name="uniprot"))
+        session.add(Annotation(name="properties"))
+        session.commit()
+    client = QdrantClient(url=qdrant_url, timeout=600.0) if qdrant_url else QdrantClient(":memory:")
+
+    upload_protein.engine = engine
+    swissprot_search_annotation.engine = engine
+    swissprot_search_annotation.client = client
+
+    _time_stage(stages, "fasta_parse", proteins, lambda: sum(1 for _ in read_fasta(fasta_file, with_md5=True)))
+    _time_stage(stages, "protein_upload", proteins, lambda: upload_protein.upload_sequences_bulk(fasta_file))
+    with Session(engine) as session:
+        _time_stage(stages, "source_upload", proteins,
+                    lambda: swiss_upload_protein_source.process_fasta_and_insert(fasta_file, session))
+    _time_stage(stages, "annotation_upload", proteins,
+                lambda: upload_annotation_source.add_annotations_bulk(engine, annotation_file, "properties"))
+    _time_stage(stages, "qdrant_upload", proteins,
+                lambda: swiss_upload_protein.upload_to_qdrant(fasta_file, accession_file, client, engine=engine))
+
+    rng = np.random.default_rng(seed + 3)
+    with h5py.File(accession_file, 'r') as f:
+        names = list(f.keys())
+        query_vectors = [f[names[index]][()] for index in rng.choice(len(names), min(queries, len(names)), replace=False)]
+
+    neighbor_lists = []
+
+    def search():
+        for batch in batched(query_vectors, batch_size):
+            neighbor_lists.extend(swissprot_search_annotation.perform_nearest_neighbor_search_batch(batch, limit))
+
+    def hydrate():
+        for batch in batched(neighbor_lists, batch_size):
+            swissprot_search_annotation.get_sequences_and_annotations([h for hashes in batch for h in hashes])
+
+    _time_stage(stages, "search", len(query_vectors), search)
+    _time_stage(stages, "hydration", len(query_vectors), hydrate)
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": engine.dialect.name,
+        "qdrant": qdrant_url or ":memory:",
+        "parameters": {
+            "proteins": proteins, "queries": len(query_vectors), "min_length": min_length, "max_length": max_length,
+            "batch_size": batch_size, "limit": limit, "seed": seed,
+        },
+        "stages": stages,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time the ingestion and search stages on synthetic data.')
+    parser.add_argument('--proteins', type=int, default=10000, help='Number of synthetic proteins')
+    parser.add_argument('--queries', type=int, default=100, help='Number of search queries')
+    parser.add_argument('--min_length', type=int, default=50, help='Minimum sequence length')
+    parser.add_argument('--max_length', type=int, default=1000, help='Maximum sequence length')
+    parser.add_argument('--batch_size', type=int, default=32, help='Queries per search and hydration batch')
+    parser.add_argument('--limit', type=int, default=200, help='Neighbors per query')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data')
+    parser.add_argument('--database_url', type=str, help='Database to load into (default: a fresh SQLite file in the work directory)')
+    parser.add_argument('--qdrant_url', type=str, help='Qdrant server to load into (default: in-memory local mode)')
+    parser.add_argument('--work_dir', type=str, help='Directory for the generated files (default: a temporary directory)')
+    parser.add_argument('--output', type=str, help='Write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = args.work_dir or temp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        results = run_benchmark(work_dir, args.proteins, args.queries, args.min_length, args.max_length,
+                                args.database_url, args.qdrant_url, args.batch_size, args.limit, args.seed)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
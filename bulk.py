@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+import io
+from itertools import islice
+from typing import Iterable, Iterator, List, Sequence, TypeVar
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from models import DataVersion
+
+T = TypeVar("T")
+
+
+# Group an iterable into lists of at most `size` items without materializing it
+def batched(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def is_postgres(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+# Increment the change counter of one kind of data on the caller's connection; committed
+# with the writes it describes. Databases from before the table get it here.
+def bump_data_version(conn: Connection, name: str):
+    DataVersion.__table__.create(conn, checkfirst=True)
+    conn.execute(text(
+        "INSERT INTO data_version (name, version) VALUES (:name, 1) "
+        "ON CONFLICT (name) DO UPDATE SET version = data_version.version + 1"
+    ), {"name": name})
+
+
+def read_data_versions(conn: Connection) -> dict:
+    if not inspect(conn).has_table("data_version"):
+        return {}
+    return dict(conn.execute(text("SELECT name, version FROM data_version")).all())
+
+
+# Escape a value for PostgreSQL's COPY text format
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+# Create a connection-local staging table (kept for the lifetime of the connection)
+def create_staging_table(conn: Connection, table: str, columns_ddl: str):
+    conn.execute(text(f"CREATE TEMP TABLE IF NOT EXISTS {table} ({columns_ddl})"))
+
+
+def clear_staging_table(conn: Connection, table: str):
+    if is_postgres(conn):
+        conn.execute(text(f"TRUNCATE {table}"))
+    else:
+        conn.execute(text(f"DELETE FROM {table}"))
+
+
+# Load rows into a table through COPY on PostgreSQL, or executemany on other engines
+def copy_rows(conn: Connection, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    if is_postgres(conn):
+        buffer = io.StringIO()
+        count = 0
+        for row in rows:
+            buffer.write("\t".join(_copy_value(value) for value in row))
+            buffer.write("\n")
+            count += 1
+        buffer.seek(0)
+        statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        cursor = conn.connection.cursor()
+        try:
+            if hasattr(cursor, "copy_expert"):  # psycopg2
+                cursor.copy_expert(statement, buffer)
+            else:  # psycopg 3
+                with cursor.copy(statement) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+        return count
+
+    params = [dict(zip(columns, row)) for row in rows]
+    if params:
+        placeholders = ", ".join(f":{column}" for column in columns)
+        conn.execute(text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"), params)
+    return len(params)
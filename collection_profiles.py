@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+import argparse
+import json
+import logging
+import time
+from typing import List, Optional
+import numpy as np
+from qdrant_client import QdrantClient, models
+from embeddings import iter_embedding_chunks
+from local_search import LocalIndex, recall_at_k
+from search_settings import search_params
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Collection layouts for the protein embeddings. "on_disk" keeps the original vectors
+# in memory-mapped storage; quantized copies marked always_ram stay in memory for search.
+PROFILES = {
+    "default": {},
+    "scalar": {
+        "quantization": models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        ),
+    },
+    "scalar_on_disk": {
+        "on_disk": True,
+        "quantization": models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        ),
+    },
+    "product_on_disk": {
+        "on_disk": True,
+        "quantization": models.ProductQuantization(
+            product=models.ProductQuantizationConfig(compression=models.CompressionRatio.X16, always_ram=True)
+        ),
+    },
+    "hnsw_tuned": {
+        "hnsw": models.HnswConfigDiff(m=32, ef_construct=256),
+    },
+}
+
+# Bytes per vector dimension kept in RAM for each quantization type
+_QUANTIZED_BYTES = {
+    models.ScalarQuantization: 1.0,
+    models.ProductQuantization: 4.0 / 16,
+}
+
+
+# Keyword arguments for client.create_collection / recreate_collection for a profile.
+# hnsw_m and ef_construct override the profile's HNSW settings.
+def collection_config(profile: str = "default", dim: int = 1024, hnsw_m: Optional[int] = None,
+                      ef_construct: Optional[int] = None) -> dict:
+    settings = PROFILES[profile]
+    hnsw = settings.get("hnsw") or models.HnswConfigDiff()
+    if hnsw_m is not None or ef_construct is not None:
+        hnsw = models.HnswConfigDiff(
+            m=hnsw_m if hnsw_m is not None else hnsw.m,
+            ef_construct=ef_construct if ef_construct is not None else hnsw.ef_construct,
+        )
+    return {
+        "vectors_config": models.VectorParams(size=dim, distance=models.Distance.COSINE, on_disk=settings.get("on_disk")),
+        "quantization_config": settings.get("quantization"),
+        "hnsw_config": hnsw if hnsw.m is not None or hnsw.ef_construct is not None else None,
+    }
+
+# Rough resident memory of a collection: vectors (unless on disk), quantized copies and
+# the HNSW graph links (about 2 * m neighbors of 4 bytes on level 0)
+def estimate_memory(profile: str, count: int, dim: int = 1024, hnsw_m: Optional[int] = None) -> dict:
+    settings = PROFILES[profile]
+    vector_bytes = count * dim * 4
+    quantization = settings.get("quantization")
+    quantized_bytes = int(count * dim * _QUANTIZED_BYTES[type(quantization)]) if quantization is not None else 0
+    m = hnsw_m or (settings.get("hnsw").m if settings.get("hnsw") else None) or 16
+    return {
+        "ram_bytes": (0 if settings.get("on_disk") else vector_bytes) + quantized_bytes + count * m * 2 * 4,
+        "disk_bytes": vector_bytes + quantized_bytes,
+    }
+
+def create_collection(client: QdrantClient, collection_name: str, profile: str = "default", dim: int = 1024,
+                      hnsw_m: Optional[int] = None, ef_construct: Optional[int] = None):
+    try:
+        client.create_collection(collection_name=collection_name, **collection_config(profile, dim, hnsw_m, ef_construct))
+        logger.info(f"Collection '{collection_name}' created with profile '{profile}'.")
+    except Exception as e:
+        if "already exists" in str(e):
+            logger.info(f"Collection '{collection_name}' already exists.")
+        else:
+            raise
+
+def _wait_for_indexing(client: QdrantClient, collection_name: str, timeout: float = 3600.0):
+    deadline = time.monotonic() + timeout
+    while client.get_collection(collection_name).status != models.CollectionStatus.GREEN:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Collection '{collection_name}' was not indexed within {timeout}s")
+        time.sleep(1.0)
+
+# Load a sample of the embeddings into one collection per profile and measure search
+# latency and recall@k against exact search over the same sample. The last `queries`
+# vectors of the sample are used as queries.
+def profile_report(client: QdrantClient, h5_file: str, profiles: List[str], sample: int = 100000, queries: int = 100,
+                   k: int = 10, hnsw_ef: int = 128, rescore: Optional[bool] = None, oversampling: Optional[float] = None,
+                   hnsw_m: Optional[int] = None, ef_construct: Optional[int] = None) -> List[dict]:
+    names = []
+    blocks = []
+    for chunk_names, block in iter_embedding_chunks(h5_file, min(sample, 10000)):
+        names.extend(chunk_names)
+        blocks.append(block)
+        if len(names) >= sample:
+            break
+    vectors = np.concatenate(blocks)[:sample]
+    names = names[:sample]
+    query_vectors = vectors[-queries:]
+    exact = LocalIndex.from_arrays(names, vectors).search_batch(query_vectors, k)
+
+    report = []
+    for profile in profiles:
+        collection_name = f"profile_{profile}"
+        client.recreate_collection(collection_name=collection_name,
+                                   **collection_config(profile, vectors.shape[1], hnsw_m, ef_construct))
+        client.upload_collection(collection_name=collection_name, vectors=vectors, ids=names, batch_size=256, wait=True)
+        _wait_for_indexing(client, collection_name)
+
+        params = search_params(hnsw_ef, rescore, oversampling)
+        latencies = []
+        found = []
+        for query_vector in query_vectors:
+            start = time.perf_counter()
+            result = client.search(collection_name=collection_name, query_vector=query_vector.tolist(), limit=k,
+                                   search_params=params)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append([str(point.id).replace("-", "") for point in result])
+
+        entry = {
+            "profile": profile,
+            "points": len(names),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            f"recall@{k}": recall_at_k(found, exact, k),
+            **estimate_memory(profile, len(names), vectors.shape[1], hnsw_m),
+        }
+        logger.info(json.dumps(entry))
+        report.append(entry)
+        client.delete_collection(collection_name)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare Qdrant collection profiles on a sample of the embeddings.')
+    parser.add_argument('h5_file', type=str, help='HDF5 file with one dataset per protein hash')
+    parser.add_argument('--profiles', type=str, nargs='+', choices=sorted(PROFILES), default=sorted(PROFILES), help='Profiles to compare')
+    parser.add_argument('--qdrant_url', type=str, default='http://localhost:6333', help='Qdrant URL')
+    parser.add_argument('--sample', type=int, default=100000, help='Number of vectors loaded per profile')
+    parser.add_argument('--queries', type=int, default=100, help='Number of sample vectors used as queries')
+    parser.add_argument('--k', type=int, default=10, help='Neighbors per query for recall@k')
+    parser.add_argument('--hnsw_ef', type=int, default=128, help='HNSW ef search parameter')
+    parser.add_argument('--hnsw_m', type=int, help='Override the HNSW m of every profile')
+    parser.add_argument('--ef_construct', type=int, help='Override the HNSW ef_construct of every profile')
+    parser.add_argument('--oversampling', type=float, help='Oversampling factor for quantized search')
+    parser.add_argument('--no_rescore', action='store_true', help='Do not rescore quantized candidates with the original vectors')
+    parser.add_argument('--output', type=str, help='Write the report as JSON to this file')
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.qdrant_url, timeout=600.0)
+    report = profile_report(client, args.h5_file, args.profiles, args.sample, args.queries, args.k, args.hnsw_ef,
+                            False if args.no_rescore else None, args.oversampling, args.hnsw_m, args.ef_construct)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=4)
+    for entry in report:
+        print(f"{entry['profile']:>16}: p50 {entry['p50_ms']:.2f} ms, p99 {entry['p99_ms']:.2f} ms, "
+              f"recall@{args.k} {entry[f'recall@{args.k}']:.3f}, ~{entry['ram_bytes'] / 2**20:.0f} MiB RAM")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Content-addressed cache of computed query embeddings, keyed by (encoder name, MD5).
+# Each encoder gets its own directory holding a memory-mapped float32 matrix with one
+# slot per entry and a JSON index listing (md5, slot) pairs in least-recently-used order.
+# The index is only written on flush(), so each slot also records the MD5 it holds in a
+# parallel keys file; after an unclean exit an index entry whose slot was reused no longer
+# matches and is dropped instead of returning another sequence's vector.
+class EmbeddingCache:
+    def __init__(self, cache_dir: str, encoder_name: str, dim: int = 1024, capacity: int = 100000):
+        self.directory = os.path.join(cache_dir, encoder_name)
+        self.index_path = os.path.join(self.directory, "index.json")
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.keys_path = os.path.join(self.directory, "keys.bin")
+        os.makedirs(self.directory, exist_ok=True)
+
+        entries = []
+        if all(os.path.exists(path) for path in (self.index_path, self.vectors_path, self.keys_path)):
+            with open(self.index_path) as index_file:
+                index = json.load(index_file)
+            if index["capacity"] != capacity:
+                logger.info(f"Reusing existing cache capacity of {index['capacity']} entries")
+            dim, capacity = index["dim"], index["capacity"]
+            entries = index["entries"]
+            mode = "r+"
+        else:
+            mode = "w+"
+
+        self.dim = dim
+        self.capacity = capacity
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode=mode, shape=(capacity, dim))
+        self.keys = np.memmap(self.keys_path, dtype="S32", mode=mode, shape=(capacity,))
+        self.entries = OrderedDict(
+            (md5_hash, slot) for md5_hash, slot in entries if self.keys[slot] == md5_hash.encode()
+        )
+        if len(self.entries) < len(entries):
+            logger.warning(f"Dropped {len(entries) - len(self.entries)} cache entries whose slots were reused "
+                           f"after the index was last written")
+        used = set(self.entries.values())
+        self.free_slots = [slot for slot in range(capacity - 1, -1, -1) if slot not in used]
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, md5_hash: str) -> Optional[np.ndarray]:
+        slot = self.entries.get(md5_hash)
+        if slot is not None and self.keys[slot] != md5_hash.encode():
+            del self.entries[md5_hash]
+            slot = None
+        if slot is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(md5_hash)
+        self.hits += 1
+        return np.array(self.vectors[slot])
+
+    def get_many(self, md5_hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        for md5_hash in md5_hashes:
+            vector = self.get(md5_hash)
+            if vector is not None:
+                found[md5_hash] = vector
+        return found
+
+    def put(self, md5_hash: str, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (self.dim,):
+            raise ValueError(f"Embedding dimension error: expected {self.dim}, got {vector.shape}")
+
+        slot = self.entries.get(md5_hash)
+        if slot is not None:
+            self.entries.move_to_end(md5_hash)
+        elif self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            # Evict the least recently used entry and reuse its slot
+            _, slot = self.entries.popitem(last=False)
+            self.evictions += 1
+        # Clear the slot's key while its vector is replaced, so a partial write never matches
+        self.keys[slot] = b""
+        self.vectors[slot] = vector
+        self.keys[slot] = md5_hash.encode()
+        self.entries[md5_hash] = slot
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    # Persist the vectors and write the index atomically
+    def flush(self):
+        self.vectors.flush()
+        self.keys.flush()
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w") as index_file:
+            json.dump({"dim": self.dim, "capacity": self.capacity, "entries": list(self.entries.items())}, index_file)
+        os.replace(temp_path, self.index_path)
+
+    def close(self):
+        self.flush()
+        del self.vectors
+        del self.keys
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import h5py
+from bulk import batched
+
+
+# List the dataset names of an embeddings file without reading any vectors
+def read_embedding_names(file_path: str) -> List[str]:
+    with h5py.File(file_path, 'r') as f:
+        return list(f.keys())
+
+
+# Stream per-protein embeddings in chunks of (names, float32 block).
+# Each dataset is read straight into its row of a preallocated contiguous
+# block, so memory is bounded by chunk_size * dim regardless of file size.
+def iter_embedding_chunks(file_path: str, chunk_size: int = 1024, names: Optional[Iterable[str]] = None,
+                          dtype=np.float32) -> Iterator[Tuple[List[str], np.ndarray]]:
+    with h5py.File(file_path, 'r') as f:
+        for chunk_names in batched(f.keys() if names is None else names, chunk_size):
+            dim = f[chunk_names[0]].shape[-1]
+            block = np.empty((len(chunk_names), dim), dtype=dtype)
+            for row, name in enumerate(chunk_names):
+                f[name].read_direct(block, dest_sel=np.s_[row])
+            yield chunk_names, block
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+import gzip
+import hashlib
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+# Read buffer used for plain and gzip-compressed FASTA files
+BUFFER_SIZE = 1 << 20
+
+
+class FastaRecord(NamedTuple):
+    header: str
+    sequence: str
+    md5: Optional[str] = None
+    accession: Optional[str] = None
+
+    # First word of the header, as Biopython reports it in record.id
+    @property
+    def id(self) -> str:
+        return self.header.split(None, 1)[0] if self.header else ""
+
+
+def calculate_md5(sequence: str) -> str:
+    return hashlib.md5(sequence.encode()).hexdigest()
+
+
+# Extract the accession from a UniProt header (e.g. Q6GZX4 from sp|Q6GZX4|001R_FRG3G)
+def uniprot_accession(header: str) -> Optional[str]:
+    parts = header.split('|')
+    if len(parts) > 2 and parts[1]:
+        return parts[1]
+    return None
+
+
+def _open(file_path: str):
+    with open(file_path, 'rb') as probe:
+        compressed = probe.read(2) == b'\x1f\x8b'
+    if compressed:
+        return gzip.open(file_path, 'rb')
+    return open(file_path, 'rb', buffering=BUFFER_SIZE)
+
+
+# Lazily yield records from a (optionally gzip-compressed) FASTA file.
+# Sequence lines are collected and joined once per record, so memory use is
+# bounded by the longest record rather than the file size.
+def read_fasta(file_path: str, with_md5: bool = False, with_accession: bool = False) -> Iterator[FastaRecord]:
+    with _open(file_path) as file:
+        yield from parse_fasta(file, with_md5, with_accession)
+
+
+# Yield records from an iterable of FASTA lines as bytes (an open file or a request body)
+def parse_fasta(lines: Iterable[bytes], with_md5: bool = False, with_accession: bool = False) -> Iterator[FastaRecord]:
+    def make_record(header: bytes, chunks: list) -> FastaRecord:
+        header_text = header.decode()
+        sequence = b''.join(chunks).decode()
+        return FastaRecord(
+            header=header_text,
+            sequence=sequence,
+            md5=calculate_md5(sequence) if with_md5 else None,
+            accession=uniprot_accession(header_text) if with_accession else None,
+        )
+
+    header = None
+    chunks = []
+    for line in lines:
+        if line.startswith(b'>'):
+            if header is not None and chunks:
+                yield make_record(header, chunks)
+            header = line[1:].strip()
+            chunks = []
+        else:
+            stripped = line.strip()
+            if stripped:
+                chunks.append(stripped)
+    if header is not None and chunks:
+        yield make_record(header, chunks)
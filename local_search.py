@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+import argparse
+import json
+import logging
+import os
+import time
+from typing import List, Optional, Sequence
+import numpy as np
+from embeddings import iter_embedding_chunks, read_embedding_names
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# Exact cosine search over a memory-mapped matrix of L2-normalized embeddings.
+# An index directory holds vectors.npy (float32 or float16), names.txt with one
+# protein hash per row, and meta.json.
+class LocalIndex:
+    def __init__(self, index_dir: str):
+        with open(os.path.join(index_dir, "meta.json")) as meta_file:
+            self.meta = json.load(meta_file)
+        with open(os.path.join(index_dir, "names.txt")) as names_file:
+            self.names = [line.rstrip("\n") for line in names_file]
+        self.vectors = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r")
+        self.rows = {name: row for row, name in enumerate(self.names)}
+
+    # Wrap vectors that are already in memory (e.g. a benchmark sample) as an index
+    @classmethod
+    def from_arrays(cls, names: Sequence[str], vectors: np.ndarray) -> "LocalIndex":
+        index = cls.__new__(cls)
+        index.names = list(names)
+        index.vectors = normalize_rows(vectors)
+        index.meta = {"count": len(index.names), "dim": int(index.vectors.shape[1]), "dtype": "float32"}
+        index.rows = {name: row for row, name in enumerate(index.names)}
+        return index
+
+    # Convert an embeddings.h5 file (one dataset per hash) into an index directory
+    @staticmethod
+    def build(h5_file: str, index_dir: str, dtype: str = "float32", chunk_size: int = 10000) -> "LocalIndex":
+        os.makedirs(index_dir, exist_ok=True)
+        names = read_embedding_names(h5_file)
+        vectors = None
+        row = 0
+        for chunk_names, block in iter_embedding_chunks(h5_file, chunk_size, names):
+            if vectors is None:
+                vectors = np.lib.format.open_memmap(os.path.join(index_dir, "vectors.npy"), mode="w+",
+                                                    dtype=dtype, shape=(len(names), block.shape[1]))
+            vectors[row:row + len(chunk_names)] = normalize_rows(block)
+            row += len(chunk_names)
+            logger.info(f"Indexed {row} of {len(names)} vectors")
+        if vectors is None:
+            raise ValueError(f"No embeddings found in {h5_file}")
+        vectors.flush()
+
+        with open(os.path.join(index_dir, "names.txt"), "w") as names_file:
+            for name in names:
+                names_file.write(name + "\n")
+        with open(os.path.join(index_dir, "meta.json"), "w") as meta_file:
+            json.dump({"count": len(names), "dim": int(vectors.shape[1]), "dtype": dtype, "source": h5_file}, meta_file)
+        del vectors
+        return LocalIndex(index_dir)
+
+    def get_vector(self, name: str) -> Optional[np.ndarray]:
+        row = self.rows.get(name)
+        if row is None:
+            return None
+        return np.asarray(self.vectors[row], dtype=np.float32)
+
+    # Batched exact top-k: score the queries against one block of rows at a time and
+    # keep a running top-k per query with argpartition, so memory stays at
+    # queries x (block_size + k) scores regardless of the index size
+    def search_batch(self, queries, limit: int = 200, block_size: int = 65536) -> List[List[str]]:
+        queries = normalize_rows(np.atleast_2d(queries))
+        count = len(self.names)
+        limit = min(limit, count)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+
+        for start in range(0, count, block_size):
+            block = np.asarray(self.vectors[start:start + block_size], dtype=np.float32)
+            scores = np.concatenate([best_scores, queries @ block.T], axis=1)
+            block_rows = np.broadcast_to(np.arange(start, start + len(block)), (len(queries), len(block)))
+            rows = np.concatenate([best_rows, block_rows], axis=1)
+            if scores.shape[1] > limit:
+                top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+                scores = np.take_along_axis(scores, top, axis=1)
+                rows = np.take_along_axis(rows, top, axis=1)
+            best_scores, best_rows = scores, rows
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        return [[self.names[row] for row in query_rows] for query_rows in best_rows]
+
+    def search(self, query, limit: int = 200) -> List[str]:
+        return self.search_batch([query], limit)[0]
+
+
+# Fraction of the exact top-k neighbors that an approximate search returned
+def recall_at_k(approximate: Sequence[Sequence[str]], exact: Sequence[Sequence[str]], k: int) -> float:
+    if not exact:
+        return 0.0
+    hits = sum(len(set(found[:k]) & set(truth[:k])) for found, truth in zip(approximate, exact))
+    total = sum(min(k, len(truth)) for truth in exact)
+    return hits / total if total else 0.0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build a memory-mapped exact-search index from an embeddings file.')
+    parser.add_argument('h5_file', type=str, help='HDF5 file with one dataset per protein hash')
+    parser.add_argument('index_dir', type=str, help='Directory to write the index to')
+    parser.add_argument('--dtype', type=str, choices=['float32', 'float16'], default='float32', help='Storage type of the vectors')
+    parser.add_argument('--chunk_size', type=int, default=10000, help='Number of vectors read from the HDF5 file at a time')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = LocalIndex.build(args.h5_file, args.index_dir, args.dtype, args.chunk_size)
+    logger.info(f"Built index of {len(index.names)} vectors in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterable, List, Optional
+import numpy as np
+
+
+# Stage timings and counters for a search run. Every timer observation is kept for the
+# aggregate percentiles; when query IDs are given the duration is also split evenly
+# across those queries, so batched stages still show up in the per-query breakdown.
+# The pipelined search runs stages in worker threads, hence the lock. Long-running
+# processes (search_server.py) turn the per-query breakdown off and keep only the last
+# max_samples observations per stage for the percentiles, so memory stays bounded.
+class Metrics:
+    def __init__(self, per_query: bool = True, max_samples: Optional[int] = None):
+        self.per_query = per_query
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.timings: Dict[str, Deque[float]] = {}
+        self.totals: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.queries: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def timer(self, stage: str, query_ids: Iterable[str] = ()):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, query_ids)
+
+    def observe(self, stage: str, seconds: float, query_ids: Iterable[str] = ()):
+        query_ids = list(query_ids) if self.per_query else []
+        with self._lock:
+            self.timings.setdefault(stage, deque(maxlen=self.max_samples)).append(seconds)
+            totals = self.totals.setdefault(stage, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+            for query_id in query_ids:
+                stages = self.queries.setdefault(query_id, {})
+                stages[stage] = stages.get(stage, 0.0) + seconds / len(query_ids)
+
+    def increment(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def summary(self, per_query: bool = True) -> dict:
+        with self._lock:
+            stages = {}
+            for stage, values in self.timings.items():
+                count, total, maximum = self.totals[stage]
+                stages[stage] = {
+                    "count": count,
+                    "total_s": total,
+                    "mean_s": total / count,
+                    "p50_s": float(np.percentile(values, 50)),
+                    "p95_s": float(np.percentile(values, 95)),
+                    "max_s": maximum,
+                }
+            result = {"stages": stages, "counters": dict(self.counters)}
+            if per_query:
+                result["queries"] = {query_id: dict(timings) for query_id, timings in self.queries.items()}
+            return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), indent=4)
+
+    # Prometheus text exposition format. Per-query timings are left out to keep the
+    # label cardinality bounded.
+    def to_prometheus(self, prefix: str = "spacewalker_search") -> str:
+        summary = self.summary(per_query=False)
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per call of each search stage.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, stats in sorted(summary["stages"].items()):
+            lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="0.5"}} {stats["p50_s"]}')
+            lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="0.95"}} {stats["p95_s"]}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["total_s"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        for counter, value in sorted(summary["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{counter}_total counter")
+            lines.append(f"{prefix}_{counter}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path: str, output_format: str = "json"):
+        with open(file_path, "w") as output:
+            output.write(self.to_prometheus() if output_format == "prometheus" else self.to_json())
+
+    # One line per stage for the end of a run
+    def report(self) -> str:
+        summary = self.summary(per_query=False)
+        lines = [
+            f"{stage}: {stats['count']} calls, {stats['total_s']:.3f}s total, p50 {stats['p50_s'] * 1000:.1f} ms, "
+            f"p95 {stats['p95_s'] * 1000:.1f} ms"
+            for stage, stats in summary["stages"].items()
+        ]
+        lines.append(", ".join(f"{counter}={value}" for counter, value in sorted(summary["counters"].items())))
+        return "\n".join(lines)
@@ -5,7 +5,8 @@ from hashlib import md5
 from typing import Optional, List, Tuple
 import json
 from sqlalchemy.types import JSON
-from sqlalchemy import Column
+from sqlalchemy import Column, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 import logging
 
 
@@ -19,8 +20,8 @@ class ProteinSource(SQLModel, table=True):
     __tablename__ = "protein_source"
     id: Optional[int] = Field(default=None, primary_key=True)
     f_source_id: int = Field(foreign_key="source.id")   
-    f_protein_id: int = Field(foreign_key="protein.id")
-    identifier: str = Field(max_length=128, nullable=False)
+    f_protein_id: int = Field(foreign_key="protein.id", index=True)
+    identifier: str = Field(max_length=128, nullable=False, index=True)
 
 class Annotation(SQLModel, table=True):
     __tablename__ = "annotation"
@@ -29,10 +30,53 @@ class Annotation(SQLModel, table=True):
 
 class ProteinAnnotation(SQLModel, table=True):
     __tablename__ = "protein_annotation"
+    # The unique key also serves lookups by f_protein_id alone (leading column)
+    # value is JSONB on PostgreSQL; the GIN index (jsonb_path_ops) serves containment (@>) queries
+    __table_args__ = (
+        UniqueConstraint("f_protein_id", "f_annotation_id", name="uq_protein_annotation_protein_annotation"),
+        Index("ix_protein_annotation_value", "value", postgresql_using="gin",
+              postgresql_ops={"value": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     f_protein_id: int = Field(foreign_key="protein.id")
     f_annotation_id: int = Field(foreign_key="annotation.id")
-    value: dict = Field(sa_column=Column(JSON))
+    value: dict = Field(sa_column=Column(JSON().with_variant(JSONB(), "postgresql")))
+
+# countByFeatureType keys materialized as columns of protein_feature (normalized as in
+# payload_filters.feature_key); other feature types stay in the annotation JSON
+FEATURE_COLUMNS = (
+    "active_site", "binding_site", "disulfide_bond", "domain", "glycosylation", "lipidation",
+    "modified_residue", "motif", "region", "signal", "site", "transit_peptide", "transmembrane",
+)
+
+# One row per protein with its length and the summed counts of the common feature types
+# over its annotations (NULL when it has none), each with a B-tree index. Rebuilt from
+# protein and protein_annotation by protein_features.py.
+class ProteinFeature(SQLModel, table=True):
+    __tablename__ = "protein_feature"
+    f_protein_id: int = Field(foreign_key="protein.id", primary_key=True)
+    length: Optional[int] = Field(default=None, index=True)
+    active_site: Optional[int] = Field(default=None, index=True)
+    binding_site: Optional[int] = Field(default=None, index=True)
+    disulfide_bond: Optional[int] = Field(default=None, index=True)
+    domain: Optional[int] = Field(default=None, index=True)
+    glycosylation: Optional[int] = Field(default=None, index=True)
+    lipidation: Optional[int] = Field(default=None, index=True)
+    modified_residue: Optional[int] = Field(default=None, index=True)
+    motif: Optional[int] = Field(default=None, index=True)
+    region: Optional[int] = Field(default=None, index=True)
+    signal: Optional[int] = Field(default=None, index=True)
+    site: Optional[int] = Field(default=None, index=True)
+    transit_peptide: Optional[int] = Field(default=None, index=True)
+    transmembrane: Optional[int] = Field(default=None, index=True)
+
+# Change counter per kind of data ("proteins", "annotations", "features", "vectors"),
+# incremented by the loaders and sync_release.py in the transaction of their writes (see
+# bulk.bump_data_version); search result caches fold the counters into their data version.
+class DataVersion(SQLModel, table=True):
+    __tablename__ = "data_version"
+    name: str = Field(max_length=128, primary_key=True)
+    version: int = Field(default=0, nullable=False)
 
 class Source(SQLModel, table=True):
     __tablename__ = "source"
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from models import FEATURE_COLUMNS
+
+# Payload layout of the proteins collection beyond the identifiers:
+#   length    sequence length (integer index)
+#   source    names of the sources mapping the protein (keyword index)
+#   features  UniProt countByFeatureType with normalized keys, e.g. {"active_site": 2};
+#             the keys in INDEXED_FEATURES get integer indexes as features.<key>
+# The same keys are materialized as columns of protein_feature in the database.
+INDEXED_FEATURES = list(FEATURE_COLUMNS)
+
+_FILTER_PATTERN = re.compile(r"^\s*([A-Za-z][\w -]*?)\s*(>=|<=|!=|=|>|<)\s*(\S.*?)\s*$")
+_RANGE_OPERATORS = {">": "gt", ">=": "gte", "<": "lt", "<=": "lte"}
+
+
+# "Active site" -> "active_site"
+def feature_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+# Merge the feature counts of a protein's annotation values. Values are either
+# countByFeatureType itself (uniprot_fetch.py) or a properties object containing it.
+def feature_counts(values: Iterable[dict]) -> Dict[str, int]:
+    counts = {}
+    for value in values:
+        if not isinstance(value, dict):
+            continue
+        value = value.get("countByFeatureType", value)
+        for name, count in value.items():
+            if isinstance(count, int) and not isinstance(count, bool):
+                key = feature_key(name)
+                counts[key] = counts.get(key, 0) + count
+    return counts
+
+def create_payload_indexes(client, collection_name: str = "proteins", features: Optional[List[str]] = None):
+    from qdrant_client import models
+    client.create_payload_index(collection_name, "length", models.PayloadSchemaType.INTEGER, wait=True)
+    client.create_payload_index(collection_name, "source", models.PayloadSchemaType.KEYWORD, wait=True)
+    for feature in INDEXED_FEATURES if features is None else features:
+        client.create_payload_index(collection_name, f"features.{feature_key(feature)}",
+                                    models.PayloadSchemaType.INTEGER, wait=True)
+
+# Split expressions such as "Active site > 0", "length <= 500" or "source = uniprot" into
+# (name, key, operator, value) tuples; value is an integer for everything but source
+def parse_expressions(expressions: Optional[List[str]]) -> List[Tuple[str, str, str, object]]:
+    parsed = []
+    for expression in expressions or []:
+        match = _FILTER_PATTERN.match(expression)
+        if match is None:
+            raise ValueError(f"Invalid filter expression: {expression!r}")
+        name, operator, value = match.groups()
+        key = feature_key(name)
+        if key == "source":
+            if operator not in ("=", "!="):
+                raise ValueError(f"source only supports = and !=: {expression!r}")
+        else:
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError(f"Expected an integer in filter expression: {expression!r}")
+        parsed.append((name, key, operator, value))
+    return parsed
+
+# Turn filter expressions into one Qdrant Filter whose conditions must all hold. Anything
+# other than length and source is a feature count; proteins without the feature have no
+# count and do not match comparisons, while != also keeps them.
+# qdrant_client is imported on call, so the SQL side (protein_features.py) and the search
+# script's startup do not load it.
+def parse_filter(expressions: Optional[List[str]]):
+    if not expressions:
+        return None
+    from qdrant_client import models
+    must = []
+    must_not = []
+    for _, key, operator, value in parse_expressions(expressions):
+        if key == "source":
+            condition = models.FieldCondition(key="source", match=models.MatchValue(value=value))
+        else:
+            field = "length" if key == "length" else f"features.{key}"
+            if operator in _RANGE_OPERATORS:
+                condition = models.FieldCondition(key=field, range=models.Range(**{_RANGE_OPERATORS[operator]: value}))
+            else:
+                condition = models.FieldCondition(key=field, match=models.MatchValue(value=value))
+
+        (must_not if operator == "!=" else must).append(condition)
+    return models.Filter(must=must or None, must_not=must_not or None)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Cache of finished query results (ranked neighbor hashes plus their hydrated sequences and
+# annotations), keyed by query MD5 and limit within a namespace (encoder, search parameters,
+# collection) and a data version. An in-process LRU sits in front of an optional SQLite file.
+# When version_fn reports a new version -- the collection or the annotation tables changed --
+# every entry is dropped, so stale neighbors are never served. Each entry remembers how long
+# it took to compute, which is what a hit saves.
+class ResultCache:
+    def __init__(self, namespace: dict, version_fn: Callable[[], str], capacity: int = 1024,
+                 cache_dir: Optional[str] = None, refresh_interval: Optional[float] = None):
+        self.namespace = json.dumps(namespace, sort_keys=True, default=str)
+        self.version_fn = version_fn
+        self.capacity = capacity
+        self.refresh_interval = refresh_interval
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+        self.db = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.db = sqlite3.connect(os.path.join(cache_dir, "results.sqlite"), check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, version TEXT NOT NULL, seconds REAL NOT NULL, value TEXT NOT NULL)"
+            )
+        self._set_version(version_fn())
+
+    def _set_version(self, version: str):
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.memory.clear()
+        if self.db is not None:
+            removed = self.db.execute("DELETE FROM results WHERE version != ?", (version,)).rowcount
+            self.db.commit()
+            if removed:
+                logger.info(f"Dropped {removed} cached results of an older collection or annotation version")
+
+    # Long-running processes re-check the data version at most every refresh_interval seconds
+    def _refresh(self):
+        if self.refresh_interval is None or time.monotonic() - self.checked_at < self.refresh_interval:
+            return
+        version = self.version_fn()
+        if version != self.version:
+            logger.info("Collection or annotations changed, clearing the result cache")
+            self._set_version(version)
+        else:
+            self.checked_at = time.monotonic()
+
+    def _key(self, md5_hash: str, limit: int) -> str:
+        return hashlib.sha256(f"{self.namespace}|{self.version}|{md5_hash}|{limit}".encode()).hexdigest()
+
+    # Returns (neighbors, homolog_infos) or None
+    def get(self, md5_hash: str, limit: int):
+        with self._lock:
+            self._refresh()
+            key = self._key(md5_hash, limit)
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+            elif self.db is not None:
+                row = self.db.execute("SELECT seconds, value FROM results WHERE key = ? AND version = ?",
+                                      (key, self.version)).fetchone()
+                if row is not None:
+                    entry = (row[0], json.loads(row[1]))
+                    self._remember(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += entry[0]
+            neighbors, homolog_infos = entry[1]
+            return neighbors, homolog_infos
+
+    def put(self, md5_hash: str, limit: int, neighbors, homolog_infos, seconds: float):
+        with self._lock:
+            key = self._key(md5_hash, limit)
+            entry = (seconds, [neighbors, homolog_infos])
+            self._remember(key, entry)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO results (key, version, seconds, value) VALUES (?, ?, ?, ?)",
+                                (key, self.version, seconds, json.dumps(entry[1])))
+                self.db.commit()
+
+    def _remember(self, key: str, entry):
+        if self.capacity <= 0:
+            return
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+            "entries_in_memory": len(self.memory),
+        }
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
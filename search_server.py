@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+import argparse
+import json
+import logging
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlparse
+from fasta import FastaRecord, calculate_md5, parse_fasta
+from embedding_cache import EmbeddingCache
+from metrics import Metrics
+from payload_filters import parse_filter
+import swissprot_search_annotation as search
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Collects queries from concurrent HTTP requests and runs them through the
+# lookup -> embed -> search -> hydrate flow together, so requests arriving within
+# max_wait seconds of each other share encoder calls, one search_batch request and
+# one hydration round trip. A single worker thread owns the encoder and the cache.
+class QueryBatcher:
+    def __init__(self, encoder, max_batch: int = 64, max_wait: float = 0.01, hnsw_ef: int = 128,
+                 token_budget: int = 4096, cache=None):
+        self.encoder = encoder
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.hnsw_ef = hnsw_ef
+        self.token_budget = token_budget
+        self.cache = cache
+        self.pending = queue.Queue()
+        self.worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+        self.worker.start()
+
+    # Queue the (query_id, sequence) pairs of one request and return a future of its results
+    def submit(self, queries: List[tuple], limit: int) -> Future:
+        future = Future()
+        self.pending.put((queries, limit, future))
+        return future
+
+    def _run(self):
+        while True:
+            requests = [self.pending.get()]
+            size = len(requests[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                requests.append(request)
+                size += len(request[0])
+
+            try:
+                self._process(requests)
+            except Exception as e:
+                logger.exception("Query batch failed")
+                for _, _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _process(self, requests):
+        search.metrics.increment("server_requests", len(requests))
+        search.metrics.increment("server_batches")
+        start = time.perf_counter()
+
+        # Answers per (md5, limit): from the result cache, or computed below. Identical
+        # sequences across all waiting requests are resolved and searched once.
+        answers = {}
+        records = []
+        missing_limits = {}
+        for queries, request_limit, _ in requests:
+            for query_id, sequence in queries:
+                md5_hash = calculate_md5(sequence)
+                if (md5_hash, request_limit) in answers or request_limit in missing_limits.get(md5_hash, ()):
+                    continue
+                cached = search.result_cache.get(md5_hash, request_limit) if search.result_cache is not None else None
+                if cached is not None:
+                    search.metrics.increment("result_cache_hits")
+                    answers[(md5_hash, request_limit)] = cached
+                    continue
+                if search.result_cache is not None:
+                    search.metrics.increment("result_cache_misses")
+                records.append(FastaRecord(query_id, sequence, md5_hash))
+                missing_limits.setdefault(md5_hash, set()).add(request_limit)
+
+        if records:
+            groups, query_vectors = search.resolve_query_batch(next(search.group_queries(records)), self.encoder,
+                                                               self.token_budget, self.cache)
+            # One search at the largest requested limit; smaller limits take a prefix of the ranking
+            limit = max(max(limits) for limits in missing_limits.values())
+            neighbor_lists = search.search_query_batch(groups, query_vectors, limit, self.hnsw_ef)
+            with search.metrics.timer("hydration"):
+                homolog_infos = search.get_sequences_and_annotations(
+                    [neighbor_hash for neighbors in neighbor_lists for neighbor_hash in neighbors]
+                )
+            seconds_per_group = (time.perf_counter() - start) / max(len(groups), 1)
+            for group, neighbors in zip(groups, neighbor_lists):
+                for request_limit in missing_limits[group.md5]:
+                    prefix = neighbors[:request_limit]
+                    infos = {neighbor_hash: homolog_infos[neighbor_hash]
+                             for neighbor_hash in prefix if neighbor_hash in homolog_infos}
+                    answers[(group.md5, request_limit)] = (prefix, infos)
+                    if search.result_cache is not None:
+                        search.result_cache.put(group.md5, request_limit, prefix, infos, seconds_per_group)
+
+        for queries, request_limit, future in requests:
+            results = []
+            for query_id, sequence in queries:
+                md5_hash = calculate_md5(sequence)
+                answer = answers.get((md5_hash, request_limit))
+                if answer is None:
+                    results.append({"id": query_id, "md5": md5_hash, "error": "No query vector"})
+                    continue
+                neighbors, infos = answer
+                results.append({"id": query_id, "md5": md5_hash, "neighbors": neighbors, "homologs": infos})
+            future.set_result(results)
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SpaceWalkerSearch/1.0"
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, document):
+        self._send(status, json.dumps(document).encode())
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            status = {"status": "ok"}
+            if search.result_cache is not None:
+                status["result_cache"] = search.result_cache.stats()
+            self._send_json(200, status)
+        elif path == "/metrics":
+            self._send(200, search.metrics.to_prometheus().encode(), "text/plain; version=0.0.4")
+        else:
+            self._send_json(404, {"error": f"Unknown path: {path}"})
+
+    # POST /search takes either JSON ({"sequences": [{"id": ..., "sequence": ...}], "limit": 200})
+    # or a FASTA body (limit as a query parameter) and returns {"results": [...]}
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/search":
+            self._send_json(404, {"error": f"Unknown path: {url.path}"})
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            if "json" in self.headers.get("Content-Type", "") or body.lstrip().startswith(b"{"):
+                document = json.loads(body)
+                queries = [(entry["id"], entry["sequence"]) for entry in document["sequences"]]
+                limit = int(document.get("limit", self.server.default_limit))
+            else:
+                queries = [(record.id, record.sequence) for record in parse_fasta(body.splitlines())]
+                limit = int(parse_qs(url.query).get("limit", [self.server.default_limit])[0])
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"Invalid request: {e}"})
+            return
+        if not 0 < limit <= self.server.max_limit:
+            self._send_json(400, {"error": f"limit must be between 1 and {self.server.max_limit}"})
+            return
+        if not queries:
+            self._send_json(200, {"results": []})
+            return
+
+        try:
+            results = self.server.batcher.submit(queries, limit).result(timeout=self.server.request_timeout)
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, {"results": results})
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def create_server(host: str, port: int, batcher: QueryBatcher, default_limit: int = 200, max_limit: int = 1000,
+                  request_timeout: float = 600.0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), SearchRequestHandler)
+    server.batcher = batcher
+    server.default_limit = default_limit
+    server.max_limit = max_limit
+    server.request_timeout = request_timeout
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve homolog searches over HTTP with the encoder kept loaded.')
+    parser.add_argument('--encoder', type=str, choices=['ProtT5', 'ESM2-3B', 'ESM2-650M', 'ESM2-150M'], default='ProtT5', help='Encoder model to use')
+    parser.add_argument('--use_gpu', action='store_true', help='Use GPU if available')
+    parser.add_argument('--local_model_path', type=str, required=True, help='Path to the local directory containing the model files')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--limit', type=int, default=200, help='Default number of homologs per query')
+    parser.add_argument('--max_limit', type=int, default=1000, help='Largest number of homologs a request may ask for')
+    parser.add_argument('--hnsw_ef', type=int, default=128, help='HNSW ef search parameter')
+    parser.add_argument('--max_batch', type=int, default=64, help='Maximum number of queries combined into one batch')
+    parser.add_argument('--max_wait_ms', type=float, default=10.0, help='How long to wait for more requests before running a batch')
+    parser.add_argument('--token_budget', type=int, default=4096, help='Maximum padded residues per encoder batch')
+    parser.add_argument('--cache_dir', type=str, help='Directory of the on-disk cache for computed query embeddings')
+    parser.add_argument('--cache_size', type=int, default=100000, help='Maximum number of embeddings kept per encoder in the cache')
+    parser.add_argument('--result_cache_size', type=int, default=1024, help='Maximum number of query results kept in memory (0 disables the result cache)')
+    parser.add_argument('--result_cache_dir', type=str, help='Directory of the on-disk tier of the result cache')
+    parser.add_argument('--result_cache_refresh', type=float, default=60.0, help='Seconds between checks for collection or annotation changes')
+    parser.add_argument('--filter', type=str, action='append', help='Payload filter applied to every search, e.g. "Active site > 0"; repeat to combine')
+    parser.add_argument('--oversampling', type=float, help='Oversampling factor when searching a quantized collection')
+    parser.add_argument('--no_rescore', action='store_true', help='Do not rescore quantized candidates with the original vectors')
+    parser.add_argument('--local_index', type=str, help='Search an index directory built by local_search.py instead of Qdrant')
+    args = parser.parse_args()
+
+    search.metrics = Metrics(per_query=False, max_samples=10000)
+    if args.local_index:
+        from local_search import LocalIndex
+        search.local_index = LocalIndex(args.local_index)
+    search.rescore = False if args.no_rescore else None
+    search.oversampling = args.oversampling
+    try:
+        search.search_filter = parse_filter(args.filter)
+    except ValueError as e:
+        parser.error(str(e))
+    search.filter_expressions = args.filter
+
+    encoder = search.load_encoder(args.encoder, args.local_model_path, args.use_gpu)
+    cache = EmbeddingCache(args.cache_dir, args.encoder, capacity=args.cache_size) if args.cache_dir else None
+    if args.result_cache_size > 0 or args.result_cache_dir:
+        search.result_cache = search.create_result_cache(args.encoder, args.hnsw_ef, args.result_cache_size,
+                                                         args.result_cache_dir, args.result_cache_refresh)
+    batcher = QueryBatcher(encoder, args.max_batch, args.max_wait_ms / 1000, args.hnsw_ef, args.token_budget, cache)
+    server = create_server(args.host, args.port, batcher, args.limit, args.max_limit)
+
+    # Shut down on SIGTERM (e.g. from a service manager) the same way as on Ctrl+C, so the
+    # caches are flushed and closed
+    def terminate(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, terminate)
+
+    logger.info(f"Serving searches on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if cache is not None:
+            cache.close()
+        if search.result_cache is not None:
+            search.result_cache.close()
@@ -0,0 +1,13 @@
+#!/usr/bin/env python
+from typing import Optional
+
+
+# Search parameters with optional rescoring of quantized candidates against the original
+# vectors. Kept out of collection_profiles.py, with the Qdrant models imported on call, so
+# the search script starts without loading qdrant_client, h5py or the embeddings module.
+def search_params(hnsw_ef: int = 128, rescore: Optional[bool] = None, oversampling: Optional[float] = None):
+    from qdrant_client import models
+    quantization = None
+    if rescore is not None or oversampling is not None:
+        quantization = models.QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+    return models.SearchParams(hnsw_ef=hnsw_ef, exact=False, quantization=quantization)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+import pytest
+from payload_filters import feature_key, parse_expressions, parse_filter
+
+
+def test_hyphenated_feature_names():
+    assert feature_key("Cross-link") == "cross_link"
+    assert parse_expressions(["Cross-link > 0", "Non-terminal residue = 1"]) == [
+        ("Cross-link", "cross_link", ">", 0),
+        ("Non-terminal residue", "non_terminal_residue", "=", 1),
+    ]
+
+def test_hyphenated_feature_filter():
+    search_filter = parse_filter(["Cross-link >= 2", "Non-terminal residue != 1"])
+    assert [condition.key for condition in search_filter.must] == ["features.cross_link"]
+    assert search_filter.must[0].range.gte == 2
+    assert [condition.key for condition in search_filter.must_not] == ["features.non_terminal_residue"]
+
+def test_invalid_expressions():
+    for expression in ("-link > 0", "source > 1", "length > many"):
+        with pytest.raises(ValueError):
+            parse_expressions([expression])
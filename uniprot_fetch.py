@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Optional, Set
+import aiohttp
+from fasta import read_fasta
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UNIPROT_URL = "https://rest.uniprot.org/uniprotkb"
+
+
+# Space request starts at least 1/rate seconds apart across all workers
+class RateLimiter:
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_time = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = asyncio.get_running_loop().time()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# Accessions recorded in the journal by earlier runs (found or missing)
+def read_journal(journal_path: str) -> Set[str]:
+    done = set()
+    if os.path.exists(journal_path):
+        with open(journal_path) as journal:
+            for line in journal:
+                accession = line.split('\t', 1)[0].strip()
+                if accession:
+                    done.add(accession)
+    return done
+
+
+# Fetch countByFeatureType for one accession. Returns the counts ({} when the entry has
+# no features), None when the entry does not exist, and raises after exhausting retries.
+async def fetch_feature_counts(session: aiohttp.ClientSession, base_url: str, accession: str,
+                               limiter: RateLimiter, max_retries: int = 3) -> Optional[dict]:
+    url = f"{base_url.rstrip('/')}/{accession}.json"
+    for attempt in range(max_retries + 1):
+        await limiter.wait()
+        try:
+            async with session.get(url) as response:
+                if response.status == 404:
+                    return None
+                if response.status == 200:
+                    entry = await response.json(content_type=None)
+                    return (entry.get("extraAttributes") or {}).get("countByFeatureType") or {}
+                error = f"HTTP {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            error = str(e) or type(e).__name__
+        if attempt < max_retries:
+            delay = 2 ** attempt
+            logger.warning(f"Fetching {accession} failed ({error}); retrying in {delay}s")
+            await asyncio.sleep(delay)
+    raise RuntimeError(f"Fetching {accession} failed after {max_retries + 1} attempts: {error}")
+
+
+# Fetch feature counts for every accession of the FASTA file that is not in the journal,
+# appending results to the JSON Lines output as they arrive
+async def fetch_annotations(fasta_file: str, output_file: str, base_url: str = UNIPROT_URL, concurrency: int = 16,
+                            rate: Optional[float] = None, max_retries: int = 3, timeout: float = 60.0) -> dict:
+    journal_path = output_file + ".journal"
+    done = read_journal(journal_path)
+    counts = {"fetched": 0, "missing": 0, "failed": 0, "skipped": len(done)}
+    limiter = RateLimiter(rate)
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    start = time.perf_counter()
+
+    with open(output_file, 'a') as output, open(journal_path, 'a') as journal:
+        # The output line is flushed before the journal line, so an interrupted run can at
+        # worst fetch and write one accession twice; it never loses one
+        def record(accession: str, status: str, feature_counts: Optional[dict]):
+            if feature_counts is not None:
+                output.write(json.dumps({"accession": accession, "countByFeatureType": feature_counts}) + "\n")
+                output.flush()
+            journal.write(f"{accession}\t{status}\n")
+            journal.flush()
+
+        async def worker(session: aiohttp.ClientSession):
+            while (accession := await queue.get()) is not None:
+                try:
+                    feature_counts = await fetch_feature_counts(session, base_url, accession, limiter, max_retries)
+                except RuntimeError as e:
+                    logger.error(str(e))
+                    counts["failed"] += 1
+                    continue
+                if feature_counts is None:
+                    record(accession, "missing", None)
+                    counts["missing"] += 1
+                else:
+                    record(accession, "ok", feature_counts)
+                    counts["fetched"] += 1
+                completed = counts["fetched"] + counts["missing"]
+                if completed % 1000 == 0:
+                    logger.info(f"Fetched {completed} entries ({completed / (time.perf_counter() - start):.1f} entries/s)")
+
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            workers = [asyncio.create_task(worker(session)) for _ in range(concurrency)]
+            queued = set()
+            for fasta_record in read_fasta(fasta_file, with_accession=True):
+                accession = fasta_record.accession
+                if accession is None or accession in done or accession in queued:
+                    continue
+                queued.add(accession)
+                await queue.put(accession)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Finished in {elapsed:.1f}s: {counts['fetched']} fetched, {counts['missing']} missing, "
+                f"{counts['failed']} failed, {counts['skipped']} already in journal")
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Fetch UniProt feature counts for the accessions of a FASTA file.')
+    parser.add_argument('fasta_file', type=str, nargs='?', default='uniprot_sprot.fasta', help='Path to the UniProt FASTA file')
+    parser.add_argument('--output', type=str, default='uniprot_annot.jsonl', help='JSON Lines output file (a .journal file is kept next to it)')
+    parser.add_argument('--base_url', type=str, default=UNIPROT_URL, help='Base URL of the UniProtKB REST endpoint')
+    parser.add_argument('--concurrency', type=int, default=16, help='Number of requests in flight')
+    parser.add_argument('--rate', type=float, default=None, help='Maximum requests per second (unlimited by default)')
+    parser.add_argument('--max_retries', type=int, default=3, help='Retries per accession before it is left for the next run')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds')
+    args = parser.parse_args()
+
+    asyncio.run(fetch_annotations(args.fasta_file, args.output, args.base_url, args.concurrency, args.rate,
+                                  args.max_retries, args.timeout))
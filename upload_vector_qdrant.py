@@ -3,7 +3,12 @@
 from qdrant_client import QdrantClient, models
 import numpy as np
 import h5py
+import argparse
 import logging
+import time
+from typing import Optional
+from embeddings import iter_embedding_chunks
+from collection_profiles import PROFILES, collection_config
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,10 +21,19 @@ client = QdrantClient(
 )
 
 # Create a collection in Qdrant
-client.create_collection(
-    collection_name="Protein Embeddings",
-    vectors_config=models.VectorParams(size=1024, distance=models.Distance.COSINE),
-)
+def create_collection(collection_name: str, profile: str = "default", hnsw_m: Optional[int] = None,
+                      ef_construct: Optional[int] = None):
+    try:
+        client.create_collection(
+            collection_name=collection_name,
+            **collection_config(profile, hnsw_m=hnsw_m, ef_construct=ef_construct),
+        )
+        logger.info(f"Collection '{collection_name}' created successfully with profile '{profile}'.")
+    except Exception as e:
+        if "already exists" in str(e):
+            logger.info(f"Collection '{collection_name}' already exists.")
+        else:
+            raise
 
 def print_hdf5_structure(file_path):
     def print_attrs(name, obj):
@@ -36,42 +50,62 @@ def print_hdf5_structure(file_path):
         # Traverse the file and print information
         f.visititems(print_attrs)
 
-# Replace 'your_file.h5' with the path to your HDF5 file
-file_path = 'embeddings.h5'
-print_hdf5_structure(file_path)
-
-# Read the embeddings from the HDF5 file and prepare points for Qdrant
-points = []
-with h5py.File(file_path, 'r') as f:
-    for dataset_name in f:
-        raw_point = f[dataset_name][:]
-        point = models.PointStruct(id=dataset_name, vector=raw_point.tolist(), payload={"protein ID": dataset_name})
-        points.append(point)
+# Stream the embeddings from the HDF5 file into the Qdrant collection.
+# Each chunk stays a contiguous float32 block and is handed to the client as is.
+def upload_embeddings(file_path: str, collection_name: str, chunk_size: int = 10000, batch_size: int = 256, parallel: int = 1):
+    uploaded = 0
+    start = time.perf_counter()
+    for chunk_number, (names, block) in enumerate(iter_embedding_chunks(file_path, chunk_size), start=1):
+        try:
+            client.upload_collection(
+                collection_name=collection_name,
+                vectors=block,
+                payload=[{"protein ID": name} for name in names],
+                ids=names,
+                batch_size=batch_size,
+                parallel=parallel,
+                wait=True,
+            )
+            uploaded += len(names)
+            elapsed = time.perf_counter() - start
+            logger.info(f"Inserted chunk {chunk_number}: {uploaded} points ({uploaded / elapsed:.0f} points/s)")
+        except Exception as e:
+            logger.error(f"Failed to insert chunk {chunk_number}: {e}")
+    return uploaded
 
-# Insert points into the Qdrant collection in batches
-batch_size = 100  # Adjust batch size as needed
-for i in range(0, len(points), batch_size):
-    batch = points[i:i + batch_size]
+# Verify insertion and include vectors in the search results
+def verify_collection(collection_name: str):
     try:
-        operation_info = client.upsert(
-            collection_name="Protein Embeddings",
-            wait=True,
-            points=batch
+        response = client.search(
+            collection_name=collection_name,
+            query_vector=np.zeros(1024).tolist(),  # Example query vector
+            limit=10,
+            with_vectors=True  # Ensure vectors are included in the search results
         )
-        logger.info(f"Inserted batch {i // batch_size + 1}: {operation_info}")
+        for point in response:
+            logger.info(f"ID: {point.id}, Payload: {point.payload}, Vector: {point.vector}")
     except Exception as e:
-        logger.error(f"Failed to insert batch {i // batch_size + 1}: {e}")
+        logger.error(f"Search failed: {e}")
 
-# Verify insertion and include vectors in the search results
-try:
-    response = client.search(
-        collection_name="protein_embeddings",
-        query_vector=np.zeros(1024).tolist(),  # Example query vector
-        limit=10,
-        with_vectors=True  # Ensure vectors are included in the search results
-    )
-    for point in response:
-        logger.info(f"ID: {point.id}, Payload: {point.payload}, Vector: {point.vector}")
-except Exception as e:
-    logger.error(f"Search failed: {e}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Upload embeddings from an HDF5 file to Qdrant.')
+    parser.add_argument('file_path', type=str, nargs='?', default='embeddings.h5', help='Path to the HDF5 file')
+    parser.add_argument('--collection', type=str, default='Protein Embeddings', help='Name of the Qdrant collection')
+    parser.add_argument('--profile', type=str, choices=sorted(PROFILES), default='default', help='Collection profile used when creating the collection')
+    parser.add_argument('--hnsw_m', type=int, help='HNSW m overriding the profile when creating the collection')
+    parser.add_argument('--ef_construct', type=int, help='HNSW ef_construct overriding the profile when creating the collection')
+    parser.add_argument('--chunk_size', type=int, default=10000, help='Number of vectors read from the HDF5 file at a time')
+    parser.add_argument('--batch_size', type=int, default=256, help='Number of points per upload request')
+    parser.add_argument('--parallel', type=int, default=1, help='Number of parallel upload workers')
+    parser.add_argument('--print_structure', action='store_true', help='Print the HDF5 file structure before uploading')
+    parser.add_argument('--verify', action='store_true', help='Run a test search against the collection after uploading')
+    args = parser.parse_args()
+
+    if args.print_structure:
+        print_hdf5_structure(args.file_path)
+
+    create_collection(args.collection, args.profile, args.hnsw_m, args.ef_construct)
+    upload_embeddings(args.file_path, args.collection, args.chunk_size, args.batch_size, args.parallel)
 
+    if args.verify:
+        verify_collection(args.collection)